@@ -53,6 +53,18 @@ class Config:
     OCR_DPI_HIGH_QUALITY = int(os.getenv('OCR_DPI_HIGH_QUALITY', '250'))
     OCR_ROW_TOLERANCE_Y = int(os.getenv('OCR_ROW_TOLERANCE_Y', '30'))
     
+    # ============================================
+    # PREPROCESADO DE IMAGEN PARA OCR
+    # ============================================
+    OCR_CROP_ENABLED = os.getenv('OCR_CROP_ENABLED', 'true').lower() == 'true'
+    OCR_CROP_INK_CONTRAST = int(os.getenv('OCR_CROP_INK_CONTRAST', '40'))
+    OCR_CROP_MIN_INK_PIXELS = int(os.getenv('OCR_CROP_MIN_INK_PIXELS', '50'))
+    OCR_CROP_MARGIN = int(os.getenv('OCR_CROP_MARGIN', '20'))
+    OCR_DOWNSCALE_ENABLED = os.getenv('OCR_DOWNSCALE_ENABLED', 'true').lower() == 'true'
+    OCR_TARGET_TEXT_HEIGHT = int(os.getenv('OCR_TARGET_TEXT_HEIGHT', '32'))
+    OCR_MIN_SCALE = float(os.getenv('OCR_MIN_SCALE', '0.5'))
+    OCR_MEDIR_SIN_RECORTE = os.getenv('OCR_MEDIR_SIN_RECORTE', 'false').lower() == 'true'
+    
     # ============================================
     # DETECCIÓN DE IMÁGENES
     # ============================================
@@ -92,6 +104,7 @@ class Config:
         print(f"OCR GPU: {cls.OCR_USE_GPU}")
         print(f"DPI: {cls.OCR_DPI} (Alta calidad: {cls.OCR_DPI_HIGH_QUALITY})")
         print(f"Confianza minima OCR: {cls.OCR_CONFIDENCE_THRESHOLD}")
+        print(f"Recorte OCR: {cls.OCR_CROP_ENABLED} (Reescalado: {cls.OCR_DOWNSCALE_ENABLED}, altura texto: {cls.OCR_TARGET_TEXT_HEIGHT}px)")
         print(f"Paginas a revisar: {cls.MAX_PAGES_TO_CHECK}")
         print(f"Workers paralelos: {cls.MAX_WORKERS}")
         print(f"Nivel de log: {cls.LOG_LEVEL}")
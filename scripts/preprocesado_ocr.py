@@ -0,0 +1,131 @@
+"""
+Preprocesado de páginas antes del OCR:
+- Recorte al contenido con tinta (márgenes y medias páginas en blanco)
+- Reducción de páginas cuyo texto es mucho mayor de lo que necesita el reconocedor
+- Conversión de coordenadas de vuelta a la página original y agrupación en filas
+
+No depende de PaddleOCR para poder verificarse por separado
+(ver scripts/verificar_preprocesado_ocr.py).
+"""
+
+import sys
+import cv2
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import config
+
+# Rango de grises (máx - mín) por debajo del cual la página se considera en blanco.
+# También es la desviación respecto al fondo a partir de la cual un píxel cuenta
+# para los límites del recorte, para no cortar contenido claro (sellos, pies de página)
+CONTRASTE_PAGINA_VACIA = 8
+# Componentes mínimos y dispersión máxima (p75/p25) para fiarse de la altura estimada
+MIN_COMPONENTES_TEXTO = 20
+MAX_DISPERSION_ALTURAS = 2.0
+
+
+def estimar_altura_texto(mascara):
+    """
+    Estima la altura de los caracteres (percentil 75, en píxeles) a partir de
+    los componentes conexos de la máscara de tinta. Devuelve None si no hay
+    suficientes caracteres o si sus alturas no son consistentes entre sí.
+    """
+    alto, ancho = mascara.shape[:2]
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mascara.astype(np.uint8), connectivity=8)
+    anchos = stats[1:, cv2.CC_STAT_WIDTH]
+    alturas = stats[1:, cv2.CC_STAT_HEIGHT]
+
+    # Descartar ruido y líneas o bordes de tabla que ocupan buena parte de la página
+    validos = (alturas >= 4) & (alturas <= alto / 4) & (anchos <= ancho / 4)
+    alturas = alturas[validos]
+    if len(alturas) < MIN_COMPONENTES_TEXTO:
+        return None
+
+    p25, p75 = np.percentile(alturas, [25, 75])
+    if p75 > p25 * MAX_DISPERSION_ALTURAS:
+        return None
+    return float(p75)
+
+
+def recortar_y_escalar(gray, contraste_tinta=None, min_pixeles_tinta=None, margen=None,
+                       recortar=None, reducir=None, altura_objetivo=None, escala_minima=None):
+    """
+    Recorta la imagen al contenido con tinta y la reduce si el texto es
+    mucho más grande de lo que necesita el reconocedor.
+    Devuelve (imagen, desplazamiento_x, desplazamiento_y, escala), o None
+    solo si la página es uniforme (en blanco). Si no se detecta tinta con
+    claridad se devuelve la imagen completa sin recortar.
+    """
+    contraste_tinta = contraste_tinta if contraste_tinta is not None else config.OCR_CROP_INK_CONTRAST
+    min_pixeles_tinta = min_pixeles_tinta if min_pixeles_tinta is not None else config.OCR_CROP_MIN_INK_PIXELS
+    margen = margen if margen is not None else config.OCR_CROP_MARGIN
+    recortar = recortar if recortar is not None else config.OCR_CROP_ENABLED
+    reducir = reducir if reducir is not None else config.OCR_DOWNSCALE_ENABLED
+    altura_objetivo = altura_objetivo or config.OCR_TARGET_TEXT_HEIGHT
+    escala_minima = escala_minima or config.OCR_MIN_SCALE
+
+    if int(gray.max()) - int(gray.min()) <= CONTRASTE_PAGINA_VACIA:
+        return None
+
+    # La tinta se mide respecto al fondo (mediana) para no perder escaneos pálidos.
+    # Esta máscara estricta solo decide si hay tinta suficiente y estima la altura
+    fondo = float(np.median(gray[::4, ::4]))
+    mascara = gray < fondo - contraste_tinta
+    if np.count_nonzero(mascara) < min_pixeles_tinta:
+        return gray, 0, 0, 1.0
+
+    alto, ancho = gray.shape[:2]
+    x0, y0 = 0, 0
+    if recortar:
+        # Los límites salen de cualquier desviación del fondo, no solo de la tinta oscura
+        contenido = np.abs(gray.astype(np.int16) - int(fondo)) > CONTRASTE_PAGINA_VACIA
+        # Exigir al menos 2 píxeles por fila/columna para ignorar motas aisladas
+        filas = np.flatnonzero(np.count_nonzero(contenido, axis=1) >= 2)
+        columnas = np.flatnonzero(np.count_nonzero(contenido, axis=0) >= 2)
+        if len(filas) == 0 or len(columnas) == 0:
+            return gray, 0, 0, 1.0
+        y0 = max(0, int(filas[0]) - margen)
+        y1 = min(alto, int(filas[-1]) + 1 + margen)
+        x0 = max(0, int(columnas[0]) - margen)
+        x1 = min(ancho, int(columnas[-1]) + 1 + margen)
+        gray = gray[y0:y1, x0:x1]
+        mascara = mascara[y0:y1, x0:x1]
+
+    escala = 1.0
+    if reducir:
+        altura_texto = estimar_altura_texto(mascara)
+        # Solo reducir cuando el texto supera claramente la altura objetivo
+        if altura_texto and altura_texto > altura_objetivo * 1.5:
+            escala = max(escala_minima, altura_objetivo / altura_texto)
+            gray = cv2.resize(gray, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+
+    return gray, x0, y0, escala
+
+
+def mapear_a_pagina(x, y, offset_x, offset_y, escala):
+    """Convierte un punto de la imagen preprocesada a coordenadas de la página original"""
+    return x / escala + offset_x, y / escala + offset_y
+
+
+def agrupar_en_filas(elementos, tolerancia_y=None):
+    """Agrupa elementos {'texto', 'x', 'y'} en filas según su coordenada Y"""
+    tolerancia_y = tolerancia_y if tolerancia_y is not None else config.OCR_ROW_TOLERANCE_Y
+
+    elementos = sorted(elementos, key=lambda x: (x['y'], x['x']))
+
+    filas = []
+    for elemento in elementos:
+        fila_encontrada = False
+        for fila in filas:
+            if abs(elemento['y'] - fila[0]['y']) <= tolerancia_y:
+                fila.append(elemento)
+                fila_encontrada = True
+                break
+        if not fila_encontrada:
+            filas.append([elemento])
+
+    for fila in filas:
+        fila.sort(key=lambda x: x['x'])
+
+    return filas
@@ -15,6 +15,7 @@ from pathlib import Path
 # Cargar configuración desde .env
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import config
+from preprocesado_ocr import recortar_y_escalar, mapear_a_pagina, agrupar_en_filas
 
 
 def _resolver_ppocr_home() -> Path:
@@ -110,10 +111,19 @@ class ProcesadorBatchPDFs:
             'exitosos': 0,
             'errores': 0,
             'paginas_ocr': 0,
-            'paginas_texto': 0
+            'paginas_texto': 0,
+            'paginas_sin_tinta': 0,
+            'paginas_ocr_procesadas': 0,
+            'pixeles_originales': 0,
+            'pixeles_ocr': 0,
+            'tiempo_ocr': 0.0,
+            'paginas_ocr_medidas': 0,
+            'tiempo_ocr_medido': 0.0,
+            'tiempo_ocr_sin_recorte': 0.0
         }
         self._ppocr_cache = _resolver_ppocr_home()
         self._ocr_reintento = False
+        self._ocr_calentado = False
         
     def inicializar_ocr(self):
         """Inicializa PaddleOCR una sola vez usando configuración de .env con parche para caracteres especiales"""
@@ -248,6 +258,17 @@ class ProcesadorBatchPDFs:
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         return gray
     
+    def _ejecutar_ocr(self, imagen, num_pagina):
+        """Ejecuta PaddleOCR sobre una imagen y devuelve (resultado, segundos)"""
+        temp_path = f"temp_ocr_{num_pagina}.jpg"
+        cv2.imwrite(temp_path, imagen)
+        try:
+            inicio = time.time()
+            result = self.ocr.ocr(temp_path)
+            return result, time.time() - inicio
+        finally:
+            os.remove(temp_path)
+    
     def extraer_texto_ocr(self, pdf_path, num_pagina):
         """Extrae texto de una página usando OCR"""
         if not self.ocr:
@@ -258,12 +279,47 @@ class ProcesadorBatchPDFs:
             img = self.convertir_pagina_a_imagen(pdf_path, num_pagina)
             img_mejorada = self.mejorar_imagen(img)
             
-            temp_path = f"temp_ocr_{num_pagina}.jpg"
-            cv2.imwrite(temp_path, img_mejorada)
+            preprocesado = recortar_y_escalar(img_mejorada)
+            if preprocesado is None:
+                # Página uniforme (sin ningún contraste): no hace falta pasar por el OCR
+                self.stats['paginas_sin_tinta'] += 1
+                print(f"  Página {num_pagina}: en blanco, OCR omitido")
+                return ""
+            img_ocr, offset_x, offset_y, escala = preprocesado
             
-            result = self.ocr.ocr(temp_path)
+            medir = (config.OCR_MEDIR_SIN_RECORTE
+                     and (offset_x, offset_y, escala, img_ocr.shape) != (0, 0, 1.0, img_mejorada.shape))
+            tiempo_sin_recorte = None
+            if medir and not self._ocr_calentado:
+                # Primera llamada sin cronometrar para que ninguna variante pague el arranque
+                self._ejecutar_ocr(img_ocr, num_pagina)
+                self._ocr_calentado = True
+            if medir and self.stats['paginas_ocr_medidas'] % 2:
+                # Alternar el orden entre páginas para repartir el calentamiento del OCR
+                _, tiempo_sin_recorte = self._ejecutar_ocr(img_mejorada, num_pagina)
+            result, tiempo_ocr = self._ejecutar_ocr(img_ocr, num_pagina)
+            if medir and tiempo_sin_recorte is None:
+                _, tiempo_sin_recorte = self._ejecutar_ocr(img_mejorada, num_pagina)
             
-            os.remove(temp_path)
+            pixeles_originales = img_mejorada.shape[0] * img_mejorada.shape[1]
+            pixeles_ocr = img_ocr.shape[0] * img_ocr.shape[1]
+            self.stats['paginas_ocr_procesadas'] += 1
+            self.stats['pixeles_originales'] += pixeles_originales
+            self.stats['pixeles_ocr'] += pixeles_ocr
+            self.stats['tiempo_ocr'] += tiempo_ocr
+            reduccion = 100 * (1 - pixeles_ocr / pixeles_originales)
+            detalle = (f"  Página {num_pagina}: {img_mejorada.shape[1]}x{img_mejorada.shape[0]} -> "
+                       f"{img_ocr.shape[1]}x{img_ocr.shape[0]} (-{reduccion:.1f}% píxeles, escala {escala:.2f}), "
+                       f"OCR {tiempo_ocr:.2f}s")
+            
+            if medir:
+                # Medición real: OCR repetido sobre la página completa (duplica el coste).
+                # Se omite si la imagen no cambió, porque el ahorro sería cero
+                self.stats['paginas_ocr_medidas'] += 1
+                self.stats['tiempo_ocr_medido'] += tiempo_ocr
+                self.stats['tiempo_ocr_sin_recorte'] += tiempo_sin_recorte
+                detalle += f" (sin recorte: {tiempo_sin_recorte:.2f}s)"
+            print(detalle)
             
             if not result or not result[0]:
                 return ""
@@ -278,30 +334,18 @@ class ProcesadorBatchPDFs:
                 if confidence > config.OCR_CONFIDENCE_THRESHOLD:
                     bbox = detection[0]
                     bbox_np = np.array(bbox)
+                    # Volver a coordenadas de la página original para que la
+                    # tolerancia de filas se aplique en la misma escala
+                    x, y = mapear_a_pagina(np.mean(bbox_np[:, 0]), np.mean(bbox_np[:, 1]),
+                                           offset_x, offset_y, escala)
                     elementos.append({
                         'texto': text,
-                        'x': np.mean(bbox_np[:, 0]),
-                        'y': np.mean(bbox_np[:, 1])
+                        'x': x,
+                        'y': y
                     })
             
-            elementos.sort(key=lambda x: (x['y'], x['x']))
-            
-            filas = []
             # Usar tolerancia de configuración
-            tolerancia_y = config.OCR_ROW_TOLERANCE_Y
-            
-            for elemento in elementos:
-                fila_encontrada = False
-                for fila in filas:
-                    if abs(elemento['y'] - fila[0]['y']) <= tolerancia_y:
-                        fila.append(elemento)
-                        fila_encontrada = True
-                        break
-                if not fila_encontrada:
-                    filas.append([elemento])
-            
-            for fila in filas:
-                fila.sort(key=lambda x: x['x'])
+            filas = agrupar_en_filas(elementos, config.OCR_ROW_TOLERANCE_Y)
             
             texto_final = []
             for fila in filas:
@@ -355,6 +399,26 @@ class ProcesadorBatchPDFs:
             self.stats['errores'] += 1
             print(f"  Error: {e}")
     
+    def imprimir_resumen_preprocesado(self):
+        """Imprime la reducción de píxeles y los tiempos de OCR medidos por página"""
+        if self.stats['paginas_sin_tinta']:
+            print(f"Páginas en blanco (OCR omitido): {self.stats['paginas_sin_tinta']}")
+        paginas = self.stats['paginas_ocr_procesadas']
+        if not paginas:
+            return
+        reduccion = 100 * (1 - self.stats['pixeles_ocr'] / self.stats['pixeles_originales'])
+        print(f"Reducción de píxeles OCR: {reduccion:.1f}% "
+              f"({self.stats['pixeles_originales'] / paginas / 1e6:.2f} -> "
+              f"{self.stats['pixeles_ocr'] / paginas / 1e6:.2f} Mpx por página)")
+        print(f"Tiempo OCR: {self.stats['tiempo_ocr'] / paginas:.2f}s por página ({paginas} páginas)")
+        medidas = self.stats['paginas_ocr_medidas']
+        if medidas:
+            con_recorte = self.stats['tiempo_ocr_medido'] / medidas
+            sin_recorte = self.stats['tiempo_ocr_sin_recorte'] / medidas
+            print(f"Tiempo OCR medido sin recorte: {sin_recorte:.2f}s por página "
+                  f"frente a {con_recorte:.2f}s con recorte "
+                  f"(ahorro medido: {sin_recorte - con_recorte:.2f}s por página, {medidas} páginas)")
+    
     def procesar_directorio(self, directorio_base):
         """Procesa recursivamente todos los PDFs en el directorio"""
         print(f"Escaneando directorio: {directorio_base}")
@@ -385,6 +449,7 @@ class ProcesadorBatchPDFs:
         print(f"Errores: {self.stats['errores']}")
         print(f"Páginas con OCR: {self.stats['paginas_ocr']}")
         print(f"Páginas con texto: {self.stats['paginas_texto']}")
+        self.imprimir_resumen_preprocesado()
         print(f"Tiempo total: {tiempo_total:.2f}s")
         print(f"Tiempo promedio: {tiempo_total/self.stats['total']:.2f}s por PDF")
 
@@ -441,6 +506,7 @@ def main():
     print(f"Errores: {procesador.stats['errores']}")
     print(f"Páginas con OCR: {procesador.stats['paginas_ocr']}")
     print(f"Páginas con texto: {procesador.stats['paginas_texto']}")
+    procesador.imprimir_resumen_preprocesado()
     print(f"Tiempo total: {tiempo_total:.2f}s")
     if procesador.stats['total'] > 0:
         print(f"Tiempo promedio: {tiempo_total/procesador.stats['total']:.2f}s por PDF")
@@ -0,0 +1,156 @@
+"""
+Verificación del preprocesado previo al OCR (recorte, reducción y mapeo de
+coordenadas) con páginas sintéticas. No necesita PaddleOCR ni PDFs.
+
+Uso:
+    python scripts/verificar_preprocesado_ocr.py
+"""
+
+import sys
+import cv2
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from preprocesado_ocr import recortar_y_escalar, estimar_altura_texto, mapear_a_pagina, agrupar_en_filas
+
+ALTO, ANCHO = 2200, 1700  # Página carta a 200 DPI
+
+PARAMS = {
+    'contraste_tinta': 40,
+    'min_pixeles_tinta': 50,
+    'margen': 20,
+    'recortar': True,
+    'reducir': True,
+    'altura_objetivo': 32,
+    'escala_minima': 0.5,
+}
+
+
+def pagina(fondo=255):
+    return np.full((ALTO, ANCHO), fondo, dtype=np.uint8)
+
+
+def verificar_pagina_en_blanco():
+    assert recortar_y_escalar(pagina(), **PARAMS) is None
+    assert recortar_y_escalar(pagina(240), **PARAMS) is None
+
+
+def verificar_recorte_y_margen():
+    gray = pagina()
+    gray[300:400, 500:600] = 0
+    img, x0, y0, escala = recortar_y_escalar(gray, **PARAMS)
+    assert (x0, y0, escala) == (480, 280, 1.0), (x0, y0, escala)
+    assert img.shape == (140, 140), img.shape
+
+    # Tinta pegada al borde: el margen no puede salirse de la página
+    gray = pagina()
+    gray[0:50, ANCHO - 50:ANCHO] = 0
+    img, x0, y0, _ = recortar_y_escalar(gray, **PARAMS)
+    assert (x0, y0) == (ANCHO - 70, 0), (x0, y0)
+    assert img.shape == (70, 70), img.shape
+
+
+def verificar_escaneo_palido():
+    # Fondo gris y texto claro: debe recortarse, no tratarse como página vacía
+    gray = pagina(235)
+    gray[1000:1020, 400:1200] = 190
+    resultado = recortar_y_escalar(gray, **PARAMS)
+    assert resultado is not None
+    assert resultado[2] == 980, resultado[1:]
+
+    # Logo oscuro y cuerpo de texto claro (gris 225): el texto claro debe quedar dentro del recorte
+    gray = pagina()
+    gray[100:200, 100:400] = 0
+    for linea in range(30):
+        y = 400 + linea * 50
+        gray[y:y + 20, 200:1500] = 225
+    img, x0, y0, escala = recortar_y_escalar(gray, **PARAMS)
+    alto_pagina = img.shape[0] / escala
+    ancho_pagina = img.shape[1] / escala
+    assert y0 <= 100 and y0 + alto_pagina >= 400 + 29 * 50 + 20, (y0, img.shape, escala)
+    assert x0 <= 100 and x0 + ancho_pagina >= 1500, (x0, img.shape, escala)
+
+    # Tinta dudosa (unas pocas motas): OCR de la página completa sin recortar
+    gray = pagina()
+    gray[1000:1003, 800:803] = 100
+    img, x0, y0, escala = recortar_y_escalar(gray, **PARAMS)
+    assert img.shape == (ALTO, ANCHO) and (x0, y0, escala) == (0, 0, 1.0)
+
+
+def verificar_altura_en_tablas_y_columnas():
+    gray = pagina()
+    # Tabla: bordes verticales de 2 px unidos por líneas horizontales
+    for x in range(100, 1601, 250):
+        gray[100:2100, x:x + 2] = 0
+    gray[100:102, 100:1602] = 0
+    gray[2098:2100, 100:1602] = 0
+    # Dos columnas de "caracteres" de 20 px con líneas base desalineadas
+    for columna, desfase in ((130, 0), (880, 17)):
+        for linea in range(40):
+            y = 150 + desfase + linea * 45
+            for c in range(10):
+                x = columna + c * 16
+                gray[y:y + 20, x:x + 12] = 0
+
+    mascara = gray < 215
+    altura = estimar_altura_texto(mascara)
+    assert altura is not None and abs(altura - 20) <= 1, altura
+    _, _, _, escala = recortar_y_escalar(gray, **PARAMS)
+    assert escala == 1.0, escala
+
+
+def verificar_mapeo_de_coordenadas():
+    # Palabras grandes (60 px) para forzar la reducción, con filas ligeramente torcidas
+    gray = pagina()
+    rng = np.random.default_rng(0)
+    originales = []
+    for fila in range(5):
+        for columna in range(5):
+            cy = 600 + fila * 150 + int(rng.integers(-8, 9))
+            cx = 300 + columna * 200
+            gray[cy - 30:cy + 30, cx - 60:cx + 60] = 0
+            originales.append({'texto': f"{fila}-{columna}", 'x': cx - 0.5, 'y': cy - 0.5})
+
+    img, x0, y0, escala = recortar_y_escalar(gray, **PARAMS)
+    assert escala < 1.0 and (x0, y0) != (0, 0), (x0, y0, escala)
+
+    # Simular las detecciones del OCR con los centros de las palabras en la imagen procesada
+    _, _, _, centros = cv2.connectedComponentsWithStats((img < 128).astype(np.uint8))
+    mapeados = []
+    for cx, cy in centros[1:]:
+        x, y = mapear_a_pagina(cx, cy, x0, y0, escala)
+        original = min(originales, key=lambda e: (e['x'] - x) ** 2 + (e['y'] - y) ** 2)
+        error = max(abs(original['x'] - x), abs(original['y'] - y))
+        assert error <= 1 / escala + 1, (original, x, y)
+        mapeados.append({'texto': original['texto'], 'x': x, 'y': y})
+    assert len(mapeados) == len(originales), len(mapeados)
+
+    # La agrupación en filas debe coincidir con la de la página sin recortar
+    filas_originales = [[e['texto'] for e in fila] for fila in agrupar_en_filas(originales, 30)]
+    filas_mapeadas = [[e['texto'] for e in fila] for fila in agrupar_en_filas(mapeados, 30)]
+    assert filas_originales == filas_mapeadas, (filas_originales, filas_mapeadas)
+
+
+def main():
+    verificaciones = [
+        verificar_pagina_en_blanco,
+        verificar_recorte_y_margen,
+        verificar_escaneo_palido,
+        verificar_altura_en_tablas_y_columnas,
+        verificar_mapeo_de_coordenadas,
+    ]
+    fallos = 0
+    for verificacion in verificaciones:
+        try:
+            verificacion()
+            print(f"OK     {verificacion.__name__}")
+        except AssertionError as e:
+            fallos += 1
+            print(f"FALLO  {verificacion.__name__}: {e}")
+    print(f"\n{len(verificaciones) - fallos}/{len(verificaciones)} verificaciones correctas")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())